@@ -1,16 +1,106 @@
 #!/usr/bin/env python3
+import time
+
+_phase_started = time.perf_counter()
+
 import os
-import httpx
-from typing import Optional, List, Dict, Any
+import sys
+import asyncio
+import random
+import json
+import hashlib
+import itertools
+import threading
+import re
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque, OrderedDict
+from typing import Optional, List, Dict, Any, Tuple, Union, TYPE_CHECKING
 from fastmcp import FastMCP
+from fastmcp.server.middleware import Middleware
 from datetime import datetime
 
+if TYPE_CHECKING:
+    # Imported lazily at runtime to keep it off the cold-start path
+    import httpx
+
+# uvicorn worker processes re-run the launched script as __mp_main__ and then
+# import "server:create_app"; registering this module under its own name
+# keeps them from running the whole setup a second time
+if __name__ in ("__main__", "__mp_main__"):
+    sys.modules.setdefault("server", sys.modules[__name__])
+
+# Duration in milliseconds of each startup phase, in the order they finished
+STARTUP_TIMINGS: Dict[str, float] = {}
+
+def mark_startup_phase(phase: str) -> None:
+    """Record how long the startup phase that just finished took."""
+    global _phase_started
+    now = time.perf_counter()
+    STARTUP_TIMINGS[phase] = round((now - _phase_started) * 1000, 1)
+    _phase_started = now
+
+mark_startup_phase("imports")
+
 mcp = FastMCP("Canvas LMS MCP Server")
 
 # Canvas API Configuration
 CANVAS_API_URL = os.environ.get("CANVAS_API_URL", "")
 CANVAS_API_TOKEN = os.environ.get("CANVAS_API_TOKEN", "")
 
+# Resilience Configuration
+# Per-attempt timeout, and the overall budget for one call including retries
+CANVAS_TIMEOUT = float(os.environ.get("CANVAS_TIMEOUT", "10"))
+CANVAS_DEADLINE = float(os.environ.get("CANVAS_DEADLINE", "30"))
+CANVAS_MAX_RETRIES = int(os.environ.get("CANVAS_MAX_RETRIES", "3"))
+CANVAS_RETRY_BACKOFF = float(os.environ.get("CANVAS_RETRY_BACKOFF", "0.5"))
+CANVAS_BREAKER_THRESHOLD = int(os.environ.get("CANVAS_BREAKER_THRESHOLD", "5"))
+CANVAS_BREAKER_COOLDOWN = float(os.environ.get("CANVAS_BREAKER_COOLDOWN", "30"))
+# Latency percentile (e.g. 95) after which a duplicate GET is sent; 0 disables hedging
+CANVAS_HEDGE_PERCENTILE = float(os.environ.get("CANVAS_HEDGE_PERCENTILE", "0"))
+
+SUPPORTED_METHODS = ("GET", "POST", "PUT", "DELETE")
+IDEMPOTENT_METHODS = ("GET", "PUT", "DELETE")
+RETRYABLE_STATUS_CODES = (502, 503, 504)
+HEDGE_MIN_SAMPLES = 20
+# Don't start a retry with less budget than this left before the deadline
+MIN_ATTEMPT_SECONDS = 1.0
+
+# Response Cache Configuration
+CANVAS_CACHE_MAX_ENTRIES = int(os.environ.get("CANVAS_CACHE_MAX_ENTRIES", "1024"))
+
+# Shared State Configuration (cache and rate-limit state shared by all workers)
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memory")
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+# Requests per second allowed per Canvas token across all workers (retries and hedged
+# duplicates included); 0 disables throttling
+CANVAS_RATE_LIMIT = int(os.environ.get("CANVAS_RATE_LIMIT", "0"))
+# Back off when Canvas reports fewer than this many units left in the token's bucket
+CANVAS_RATE_LIMIT_FLOOR = float(os.environ.get("CANVAS_RATE_LIMIT_FLOOR", "100"))
+
+# Content Conversion Configuration
+CONTENT_FORMATS = ("markdown", "text", "html")
+# Default size limit for converted page, syllabus and message bodies
+CONTENT_MAX_CHARS = int(os.environ.get("CONTENT_MAX_CHARS", "20000"))
+# Documents larger than this are converted in the worker pool instead of on the event loop
+CONTENT_OFFLOAD_CHARS = int(os.environ.get("CONTENT_OFFLOAD_CHARS", "20000"))
+CONTENT_WORKERS = int(os.environ.get("CONTENT_WORKERS", "2"))
+CONTENT_CACHE_TTL = float(os.environ.get("CONTENT_CACHE_TTL", "86400"))
+# Converted documents larger than this are not cached
+CONTENT_CACHE_MAX_CHARS = int(os.environ.get("CONTENT_CACHE_MAX_CHARS", "500000"))
+# Total characters of converted output kept per process
+CONTENT_CACHE_TOTAL_CHARS = int(os.environ.get("CONTENT_CACHE_TOTAL_CHARS", "5000000"))
+
+# Deployment Configuration
+MCP_WORKERS = int(os.environ.get("MCP_WORKERS", "1"))
+# Defer tool registration and HTTP client setup until after the server is listening
+MCP_FAST_STARTUP = os.environ.get("MCP_FAST_STARTUP", "").lower() in ("1", "true", "yes")
+# Median import-time budget for --benchmark-startup (~1.1 s measured in fast-startup mode,
+# mostly the FastMCP import, which varies by machine; the phase budget below is the tight gate)
+MCP_STARTUP_BUDGET_MS = float(os.environ.get("MCP_STARTUP_BUDGET_MS", "1500"))
+# Budget for the server's own startup phases (setup and tool_definitions) in fast-startup mode
+MCP_STARTUP_PHASE_BUDGET_MS = float(os.environ.get("MCP_STARTUP_PHASE_BUDGET_MS", "50"))
+
 def get_headers() -> dict:
     """Get headers for Canvas API requests."""
     if not CANVAS_API_TOKEN:
@@ -20,27 +110,433 @@ def get_headers() -> dict:
         "Content-Type": "application/json"
     }
 
+# ===== SHARED STATE BACKEND =====
+
+class MemoryBackend:
+    """
+    In-process key/value store with per-key expiry and LRU eviction.
+    
+    This is the default for single-worker deployments. State is not shared
+    between worker processes.
+    """
+    
+    def __init__(self, max_entries: int = CANVAS_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[Optional[float], str]]" = OrderedDict()
+    
+    def _live(self, key: str) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+    
+    def _store(self, key: str, value: str, ttl: Optional[float]) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.max_entries:
+            self._purge_expired()
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+    
+    def _purge_expired(self) -> None:
+        # Dead rate-limit counters and locks must not evict live cache entries
+        now = time.monotonic()
+        expired = [
+            key for key, (expires_at, _) in self._data.items()
+            if expires_at is not None and now >= expires_at
+        ]
+        for key in expired:
+            del self._data[key]
+    
+    async def get(self, key: str) -> Optional[str]:
+        return self._live(key)
+    
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        self._store(key, value, ttl)
+    
+    async def add(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """Set a key only if it does not exist; returns whether it was set."""
+        if self._live(key) is not None:
+            return False
+        self._store(key, value, ttl)
+        return True
+    
+    async def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        """Increment a counter, starting its expiry when it is created."""
+        current = self._live(key)
+        if current is None:
+            self._store(key, "1", ttl)
+            return 1
+        expires_at, _ = self._data[key]
+        count = int(current) + 1
+        self._data[key] = (expires_at, str(count))
+        return count
+    
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+    
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._data if key.startswith(prefix)]:
+            del self._data[key]
+
+class RedisBackend:
+    """
+    Key/value store on a Redis-compatible server, shared by every worker.
+    
+    Requires the optional `redis` package unless a client is passed in (tests
+    use an in-memory fake). Keys are evicted by the server's own maxmemory policy.
+    """
+    
+    def __init__(self, url: str = REDIS_URL, client: Any = None):
+        if client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError as e:
+                raise ImportError(
+                    "CACHE_BACKEND=redis requires the 'redis' package (pip install redis)"
+                ) from e
+            client = redis.from_url(url, decode_responses=True)
+        self.client = client
+    
+    @staticmethod
+    def _px(ttl: Optional[float]) -> Optional[int]:
+        return max(1, int(ttl * 1000)) if ttl else None
+    
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(key)
+    
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        await self.client.set(key, value, px=self._px(ttl))
+    
+    async def add(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """Set a key only if it does not exist; returns whether it was set."""
+        return bool(await self.client.set(key, value, px=self._px(ttl), nx=True))
+    
+    async def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        """Increment a counter, starting its expiry when it is created."""
+        count = await self.client.incr(key)
+        if count == 1 and ttl:
+            await self.client.pexpire(key, self._px(ttl))
+        return count
+    
+    async def delete(self, key: str) -> None:
+        await self.client.delete(key)
+    
+    async def delete_prefix(self, prefix: str) -> None:
+        pattern = re.sub(r"([*?\[\]\\])", r"\\\1", prefix) + "*"
+        keys = [key async for key in self.client.scan_iter(match=pattern)]
+        if keys:
+            await self.client.delete(*keys)
+
+_backend: Optional[Any] = None
+
+def get_backend() -> Any:
+    """Get the configured shared state backend, creating it on first use."""
+    global _backend
+    if _backend is None:
+        if CACHE_BACKEND == "memory":
+            _backend = MemoryBackend()
+        elif CACHE_BACKEND == "redis":
+            _backend = RedisBackend(REDIS_URL)
+        else:
+            raise ValueError(f"Unsupported CACHE_BACKEND: {CACHE_BACKEND} (expected 'memory' or 'redis')")
+    return _backend
+
+def token_fingerprint() -> str:
+    """Short, non-reversible id for the Canvas token, used to namespace shared state."""
+    return hashlib.sha256(CANVAS_API_TOKEN.encode()).hexdigest()[:16]
+
+# ===== RATE LIMITING =====
+
+async def acquire_rate_limit() -> None:
+    """
+    Wait until the current Canvas token may send another request.
+    
+    Requests are counted in one-second windows in the shared backend, so the
+    limit holds across all workers. While Canvas reports that the token's
+    bucket is nearly empty (X-Rate-Limit-Remaining), every worker also waits
+    for it to drain.
+    """
+    if CANVAS_RATE_LIMIT <= 0:
+        return
+    backend = get_backend()
+    prefix = f"ratelimit:{token_fingerprint()}"
+    while True:
+        remaining = await backend.get(f"{prefix}:remaining")
+        now = time.time()
+        if remaining is None or float(remaining) >= CANVAS_RATE_LIMIT_FLOOR:
+            window = int(now)
+            if await backend.incr(f"{prefix}:{window}", ttl=2) <= CANVAS_RATE_LIMIT:
+                return
+        await asyncio.sleep(int(now) + 1 - now)
+
+async def record_rate_limit(response: "httpx.Response") -> None:
+    """Share the token's remaining Canvas quota with the other workers."""
+    remaining = response.headers.get("X-Rate-Limit-Remaining")
+    if CANVAS_RATE_LIMIT <= 0 or remaining is None:
+        return
+    await get_backend().set(f"ratelimit:{token_fingerprint()}:remaining", remaining, ttl=5)
+
+# ===== RESILIENCE =====
+
+class CircuitOpenError(RuntimeError):
+    """Raised when Canvas calls for an endpoint class are short-circuited."""
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one endpoint class.
+    
+    After `threshold` failures the breaker opens and rejects calls until
+    `cooldown` seconds pass, then lets a single probe through. A successful
+    probe closes the breaker; a failed one re-opens it for another cooldown.
+    """
+    
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+    
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+    
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+    
+    def allow(self) -> bool:
+        state = self.state
+        if state == "half_open":
+            # Re-arm the cooldown so only this call probes Canvas
+            self.opened_at = time.monotonic()
+        return state != "open"
+    
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+    
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_latencies: Dict[str, deque] = {}
+_client: Optional["httpx.AsyncClient"] = None
+_client_lock = threading.Lock()
+
+def endpoint_class(endpoint: str) -> str:
+    """
+    Collapse an endpoint path into its class, e.g. 'courses/1/pages/intro' -> 'courses/*/pages/*'.
+    
+    Canvas paths alternate collection names and identifiers, so every odd
+    segment is treated as an identifier.
+    """
+    segments = endpoint.strip("/").split("/")
+    return "/".join("*" if i % 2 else segment for i, segment in enumerate(segments))
+
+def get_breaker(key: str) -> CircuitBreaker:
+    """Get the circuit breaker for an endpoint class, creating it on first use."""
+    if key not in _breakers:
+        _breakers[key] = CircuitBreaker(CANVAS_BREAKER_THRESHOLD, CANVAS_BREAKER_COOLDOWN)
+    return _breakers[key]
+
+def get_client() -> "httpx.AsyncClient":
+    """Get the shared HTTP client so connections to Canvas are pooled across calls."""
+    global _client
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            import httpx
+            _client = httpx.AsyncClient(timeout=CANVAS_TIMEOUT)
+        return _client
+
+def record_latency(key: str, seconds: float) -> None:
+    """Record a successful call latency for hedging decisions."""
+    if key not in _latencies:
+        _latencies[key] = deque(maxlen=200)
+    _latencies[key].append(seconds)
+
+def hedge_delay(key: str) -> Optional[float]:
+    """Return the configured latency percentile for an endpoint class, or None if hedging is off."""
+    samples = _latencies.get(key)
+    if CANVAS_HEDGE_PERCENTILE <= 0 or not samples or len(samples) < HEDGE_MIN_SAMPLES:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * CANVAS_HEDGE_PERCENTILE / 100))
+    return ordered[index]
+
+def retry_delay(attempt: int, response: Optional["httpx.Response"] = None) -> float:
+    """Exponential backoff with full jitter, honoring Retry-After when Canvas sends it."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), CANVAS_TIMEOUT)
+    return random.uniform(0, CANVAS_RETRY_BACKOFF * (2 ** (attempt - 1)))
+
+def next_retry_delay(
+    attempt: int, deadline: float, response: Optional["httpx.Response"] = None
+) -> Optional[float]:
+    """Return the delay before the next retry, or None once retries or the call's budget run out."""
+    if attempt >= CANVAS_MAX_RETRIES:
+        return None
+    delay = retry_delay(attempt + 1, response)
+    if deadline - time.monotonic() - delay < MIN_ATTEMPT_SECONDS:
+        return None
+    return delay
+
+def is_retryable_error(method: str, error: "httpx.TransportError") -> bool:
+    """
+    Decide whether a transport error may be retried.
+    
+    Idempotent methods are always retried. POSTs are only retried when the
+    connection was never established, so Canvas cannot have processed them
+    and a retry cannot create a duplicate submission or message.
+    """
+    import httpx
+    
+    if method in IDEMPOTENT_METHODS:
+        return True
+    return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+
+def is_throttled(response: "httpx.Response") -> bool:
+    """Whether Canvas rejected a request for rate limiting (429, or its 403 Rate Limit Exceeded)."""
+    if response.status_code == 429:
+        return True
+    if response.status_code != 403:
+        return False
+    try:
+        remaining = float(response.headers.get("X-Rate-Limit-Remaining", "1"))
+    except ValueError:
+        remaining = 1
+    return remaining <= 0 or "Rate Limit Exceeded" in response.text
+
+def is_retryable_response(method: str, response: "httpx.Response") -> bool:
+    """Decide whether an error response may be retried (throttled POSTs were never processed)."""
+    if is_throttled(response):
+        return True
+    return method in IDEMPOTENT_METHODS and response.status_code in RETRYABLE_STATUS_CODES
+
+def is_failed_response(response: "httpx.Response") -> bool:
+    """Whether a GET response should lose a hedging race to the other request."""
+    return response.status_code >= 500 or is_retryable_response("GET", response)
+
+async def send_hedged(key: str, send) -> "httpx.Response":
+    """
+    Send a GET, racing a duplicate once it outlives the hedge percentile.
+    
+    The first successful response wins and the other request is cancelled.
+    Errors and 5xx or throttled responses only win when both requests fail.
+    """
+    delay = hedge_delay(key)
+    pending = {asyncio.ensure_future(send())}
+    try:
+        if delay is not None:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                pending.add(asyncio.ensure_future(send()))
+        
+        failed: Optional[asyncio.Future] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None and not is_failed_response(task.result()):
+                    return task.result()
+                failed = task
+        return failed.result()
+    finally:
+        # Also reached when the caller is cancelled mid-race
+        for task in pending:
+            task.cancel()
+
 async def make_canvas_request(
     method: str, 
     endpoint: str, 
     params: Optional[Dict[str, Any]] = None,
     data: Optional[Dict[str, Any]] = None
 ) -> Any:
-    """Make a request to Canvas API."""
+    """
+    Make a request to Canvas API.
+    
+    Transient failures (connection errors, throttling and 502-504 responses) are
+    retried with backoff within an overall deadline, a per-endpoint-class circuit breaker fails fast while
+    Canvas is degraded, and GETs are optionally hedged to cut tail latency.
+    """
+    import httpx
+    
+    method = method.upper()
+    if method not in SUPPORTED_METHODS:
+        raise ValueError(f"Unsupported HTTP method: {method}")
+    
     url = f"{CANVAS_API_URL}/{endpoint}"
     headers = get_headers()
+    key = endpoint_class(endpoint)
+    breaker = get_breaker(key)
+    client = get_client()
+    deadline = time.monotonic() + CANVAS_DEADLINE
     
-    async with httpx.AsyncClient() as client:
-        if method.upper() == "GET":
-            response = await client.get(url, headers=headers, params=params, timeout=30.0)
-        elif method.upper() == "POST":
-            response = await client.post(url, headers=headers, json=data, params=params, timeout=30.0)
-        elif method.upper() == "PUT":
-            response = await client.put(url, headers=headers, json=data, params=params, timeout=30.0)
-        elif method.upper() == "DELETE":
-            response = await client.delete(url, headers=headers, timeout=30.0)
+    async def send() -> httpx.Response:
+        await acquire_rate_limit()
+        # No attempt may run past the call's deadline
+        timeout = min(CANVAS_TIMEOUT, max(deadline - time.monotonic(), MIN_ATTEMPT_SECONDS))
+        if method == "DELETE":
+            response = await client.delete(url, headers=headers, timeout=timeout)
         else:
-            raise ValueError(f"Unsupported HTTP method: {method}")
+            response = await client.request(
+                method, url, headers=headers, json=data, params=params, timeout=timeout
+            )
+        await record_rate_limit(response)
+        return response
+    
+    # The breaker sees one result per logical call, after any retries
+    if not breaker.allow():
+        raise CircuitOpenError(
+            f"Canvas endpoint '{key}' is failing; retry in {breaker.retry_after():.0f}s"
+        )
+    
+    attempt = 0
+    while True:
+        started = time.monotonic()
+        try:
+            if method == "GET":
+                response = await send_hedged(key, send)
+            else:
+                response = await send()
+        except httpx.TransportError as e:
+            delay = next_retry_delay(attempt, deadline) if is_retryable_error(method, e) else None
+            if delay is not None:
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            breaker.record_failure()
+            raise
+        
+        if response.status_code < 500:
+            record_latency(key, time.monotonic() - started)
+        
+        if is_retryable_response(method, response):
+            delay = next_retry_delay(attempt, deadline, response)
+            if delay is not None:
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+        
+        # Throttling says nothing about the endpoint's health
+        if response.status_code >= 500:
+            breaker.record_failure()
+        elif not is_throttled(response):
+            breaker.record_success()
         
         response.raise_for_status()
         
@@ -50,9 +546,570 @@ async def make_canvas_request(
         
         return response.json()
 
+# ===== RESPONSE CACHE =====
+
+_refreshing: Dict[str, asyncio.Task] = {}
+
+def cache_key(endpoint: str, params: Optional[Dict[str, Any]]) -> str:
+    """Build a stable cache key for a GET request, namespaced by Canvas token."""
+    return f"cache:{token_fingerprint()}:{endpoint}?{json.dumps(params or {}, sort_keys=True)}"
+
+async def cache_get(key: str) -> Optional[Tuple[float, Any]]:
+    """Get a cached (fetched_at, data) entry from the shared backend."""
+    raw = await get_backend().get(key)
+    if raw is None:
+        return None
+    entry = json.loads(raw)
+    return entry["fetched_at"], entry["data"]
+
+async def cache_set(key: str, data: Any, expires_in: float) -> None:
+    """Store a response in the shared backend until it is too stale to serve."""
+    entry = json.dumps({"fetched_at": time.time(), "data": data})
+    await get_backend().set(key, entry, ttl=expires_in)
+
+async def refresh_cached(key: str, endpoint: str, params: Optional[Dict[str, Any]], expires_in: float) -> Any:
+    """Fetch a GET from Canvas and store it in the response cache."""
+    data = await make_canvas_request("GET", endpoint, params=params)
+    await cache_set(key, data, expires_in)
+    return data
+
+async def invalidate_cached(endpoint: str) -> None:
+    """Drop every cached response for an endpoint (any params) after a write changes it."""
+    prefix = cache_key(endpoint, None).rsplit("?", 1)[0] + "?"
+    for key, task in list(_refreshing.items()):
+        if key.startswith(prefix):
+            task.cancel()
+    await get_backend().delete_prefix(prefix)
+
+def max_call_duration() -> float:
+    """Worst-case duration of one make_canvas_request call, including retries and backoff."""
+    # The deadline bounds when attempts start; the last one can overrun by up to one timeout
+    return CANVAS_DEADLINE + CANVAS_TIMEOUT + MIN_ATTEMPT_SECONDS
+
+def schedule_refresh(key: str, endpoint: str, params: Optional[Dict[str, Any]], expires_in: float) -> None:
+    """Refresh a cache entry in the background, at most once at a time per key across workers."""
+    if key in _refreshing:
+        return
+    
+    async def run():
+        backend = get_backend()
+        lock = f"lock:{key}"
+        owner = f"{os.getpid()}:{id(asyncio.current_task())}"
+        locked = False
+        try:
+            locked = await backend.add(lock, owner, ttl=max_call_duration())
+            if locked:
+                await refresh_cached(key, endpoint, params, expires_in)
+        except Exception:
+            # Keep serving the stale entry; the circuit breaker tracks the failure
+            pass
+        finally:
+            _refreshing.pop(key, None)
+            if locked and await backend.get(lock) == owner:
+                await backend.delete(lock)
+    
+    _refreshing[key] = asyncio.ensure_future(run())
+
+async def make_cached_canvas_request(
+    endpoint: str,
+    params: Optional[Dict[str, Any]] = None,
+    ttl: float = 60,
+    max_stale: float = 0
+) -> Tuple[Any, Optional[float]]:
+    """
+    Make a GET request to Canvas API with stale-while-revalidate caching.
+    
+    Entries younger than `ttl` seconds are served as-is. Entries up to
+    `max_stale` seconds past their ttl are served immediately while a
+    background refresh runs, so reads keep working while Canvas is slow or
+    down. Older entries are refetched before returning.
+    
+    Returns:
+        A (data, stale_age) tuple, where stale_age is the age in seconds of a
+        stale entry that was served, or None for fresh data.
+    """
+    key = cache_key(endpoint, params)
+    expires_in = ttl + max_stale
+    entry = await cache_get(key)
+    if entry is not None:
+        fetched_at, data = entry
+        age = time.time() - fetched_at
+        if age < ttl:
+            return data, None
+        if age < expires_in:
+            schedule_refresh(key, endpoint, params, expires_in)
+            return data, round(age, 1)
+    
+    return await refresh_cached(key, endpoint, params, expires_in), None
+
+def mark_stale(result: Any, stale_age: Optional[float]) -> Any:
+    """
+    Flag a tool result built from a stale cache entry with its age.
+    
+    Dicts gain `stale` and `stale_age_seconds` keys; lists are wrapped as
+    {"items": [...], "stale": True, "stale_age_seconds": age}.
+    """
+    if stale_age is None:
+        return result
+    if isinstance(result, list):
+        return {"items": result, "stale": True, "stale_age_seconds": stale_age}
+    return {**result, "stale": True, "stale_age_seconds": stale_age}
+
+# ===== CONTENT CONVERSION =====
+
+HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+BLOCK_TAGS = (
+    "p", "div", "section", "article", "header", "footer", "blockquote",
+    "figure", "figcaption", "table", "dl", "dt", "dd", "address"
+)
+SKIPPED_TAGS = ("script", "style", "head", "noscript", "template")
+MEDIA_TAGS = ("iframe", "video", "audio", "embed", "object")
+CONVERT_CHUNK_SIZE = 64 * 1024
+# Tags, closing tags and comments; conversation bodies without them are plain text
+HTML_MARKUP = re.compile(r"<[a-zA-Z/!]")
+
+class Verbatim(str):
+    """Text from inside <pre> that whitespace normalization must leave alone."""
+
+class HTMLToText(HTMLParser):
+    """
+    Incremental Canvas HTML to markdown or plain text converter.
+    
+    Feed it the document in chunks; output is split into sections at each
+    heading. Inline styles, scripts and other presentation-only markup are
+    dropped and embedded media is reduced to a single reference line.
+    """
+    
+    def __init__(self, markdown: bool = True):
+        super().__init__(convert_charrefs=True)
+        self.markdown = markdown
+        self.sections: List[Tuple[str, List[str]]] = [("", [])]
+        self.skip_depth = 0
+        self.pre_depth = 0
+        self.lists: List[List[Any]] = []
+        # [rows finished, cells in the current row] for each open table
+        self.tables: List[List[int]] = []
+        self.links: List[Optional[str]] = []
+        self.heading: Optional[List[str]] = None
+        # Open list items and table cells, innermost last: ("li", list depth) or ("cell", 0)
+        self.containers: List[Tuple[str, int]] = []
+    
+    def emit(self, text: str) -> None:
+        self.sections[-1][1].append(text)
+    
+    def at_line_start(self) -> bool:
+        parts = self.sections[-1][1]
+        return not parts or parts[-1].endswith((" ", "\n"))
+    
+    def close_items(self, depth: int) -> None:
+        """Drop list items nested at least depth deep, including ones left unclosed."""
+        while self.containers and self.containers[-1][0] == "li" and self.containers[-1][1] >= depth:
+            self.containers.pop()
+    
+    def end_cell(self) -> None:
+        """Close the open table cell, if any, including one left unclosed."""
+        if self.containers and self.containers[-1][0] == "cell":
+            self.containers.pop()
+            self.emit("|" if self.at_line_start() else " |")
+    
+    def block_break(self) -> None:
+        """
+        Separate a block element from what precedes it.
+        
+        Blank lines would split a list item or break a table row, so blocks
+        inside them are joined with a line break or a space instead.
+        """
+        if not self.containers:
+            self.emit("\n\n")
+        elif not self.at_line_start():
+            kind, depth = self.containers[-1]
+            self.emit(" " if kind == "cell" else "\n" + "  " * depth)
+    
+    def emit_inline(self, markdown: str) -> None:
+        if self.markdown:
+            self.emit(markdown)
+    
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+            return
+        if self.skip_depth:
+            return
+        attributes = dict(attrs)
+        
+        if tag == "table":
+            self.tables.append([0, 0])
+        
+        if tag in HEADING_TAGS:
+            self.sections.append(("", []))
+            self.heading = []
+            self.emit("#" * int(tag[1]) + " " if self.markdown else "")
+        elif tag in BLOCK_TAGS:
+            self.block_break()
+        elif tag == "br":
+            in_cell = self.containers and self.containers[-1][0] == "cell"
+            self.emit(" " if in_cell else "\n")
+        elif tag == "hr":
+            self.emit("\n\n---\n\n" if self.markdown else "\n\n")
+        elif tag in ("ul", "ol"):
+            if not self.lists:
+                self.emit("\n")
+            self.lists.append([tag, 0])
+        elif tag == "li":
+            self.close_items(len(self.lists))
+            self.containers.append(("li", len(self.lists)))
+            marker = "-"
+            if self.lists and self.lists[-1][0] == "ol":
+                self.lists[-1][1] += 1
+                marker = f"{self.lists[-1][1]}."
+            self.emit("\n" + "  " * max(0, len(self.lists) - 1) + marker + " ")
+        elif tag == "tr":
+            self.end_cell()
+            if self.tables:
+                self.tables[-1][1] = 0
+            self.emit("\n|")
+        elif tag in ("td", "th"):
+            self.end_cell()
+            self.containers.append(("cell", 0))
+            if self.tables:
+                self.tables[-1][1] += 1
+            self.emit(" ")
+        elif tag == "pre":
+            self.pre_depth += 1
+            self.emit("\n\n```\n" if self.markdown else "\n\n")
+        elif tag == "code" and not self.pre_depth:
+            self.emit_inline("`")
+        elif tag in ("strong", "b"):
+            self.emit_inline("**")
+        elif tag in ("em", "i"):
+            self.emit_inline("*")
+        elif tag == "a":
+            self.links.append(attributes.get("href"))
+            self.emit_inline("[")
+        elif tag == "img":
+            alt = attributes.get("alt") or ""
+            src = attributes.get("src") or ""
+            self.emit(f"![{alt}]({src})" if self.markdown else f"[image: {alt or src}]")
+        elif tag in MEDIA_TAGS:
+            src = attributes.get("src") or attributes.get("data")
+            if src:
+                self.emit(f"\n[{tag}: {src}]\n")
+    
+    def handle_endtag(self, tag: str) -> None:
+        if tag in SKIPPED_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if self.skip_depth:
+            return
+        
+        if tag == "table" and self.tables:
+            self.end_cell()
+            self.tables.pop()
+        
+        if tag in HEADING_TAGS:
+            if self.heading is not None:
+                title = " ".join("".join(self.heading).split())
+                self.heading = None
+                if title:
+                    self.sections[-1] = (title, self.sections[-1][1])
+                else:
+                    # An empty heading starts no section; keep anything else it held
+                    _, parts = self.sections.pop()
+                    self.sections[-1][1].extend(parts[1:])
+            self.emit("\n\n")
+        elif tag in BLOCK_TAGS:
+            if not self.containers:
+                self.emit("\n\n")
+        elif tag == "li":
+            self.close_items(len(self.lists))
+        elif tag in ("ul", "ol"):
+            if self.lists:
+                self.lists.pop()
+            self.close_items(len(self.lists) + 1)
+            if not self.lists:
+                self.emit("\n")
+        elif tag in ("td", "th"):
+            self.end_cell()
+        elif tag == "tr" and self.tables:
+            self.end_cell()
+            rows, cells = self.tables[-1]
+            self.tables[-1][0] += 1
+            # Markdown tables need a separator row after the header row
+            if rows == 0 and self.markdown and cells:
+                self.emit("\n|" + " --- |" * cells)
+        elif tag == "pre":
+            self.pre_depth = max(0, self.pre_depth - 1)
+            self.emit("\n```\n\n" if self.markdown else "\n\n")
+        elif tag == "code" and not self.pre_depth:
+            self.emit_inline("`")
+        elif tag in ("strong", "b"):
+            self.emit_inline("**")
+        elif tag in ("em", "i"):
+            self.emit_inline("*")
+        elif tag == "a":
+            href = self.links.pop() if self.links else None
+            if self.markdown:
+                self.emit(f"]({href})" if href else "]")
+            elif href and not href.startswith("#"):
+                self.emit(f" ({href})")
+    
+    def handle_data(self, data: str) -> None:
+        if self.skip_depth:
+            return
+        if self.pre_depth:
+            data = Verbatim(data)
+        else:
+            data = re.sub(r"\s+", " ", data)
+            if self.at_line_start():
+                data = data.lstrip()
+        if self.heading is not None:
+            self.heading.append(data)
+        if data:
+            self.emit(data)
+    
+    def get_sections(self) -> List[Tuple[str, str]]:
+        """Return non-empty (title, text) sections with whitespace outside <pre> normalized."""
+        sections = []
+        for title, parts in self.sections:
+            chunks = []
+            for verbatim, group in itertools.groupby(parts, key=lambda part: isinstance(part, Verbatim)):
+                chunk = "".join(group)
+                if not verbatim:
+                    chunk = re.sub(r"[ \t]+\n", "\n", chunk)
+                    chunk = re.sub(r"\n{3,}", "\n\n", chunk)
+                chunks.append(chunk)
+            text = "".join(chunks).strip()
+            if text:
+                sections.append((title or "(untitled)", text))
+        return sections
+
+def convert_html(html: str, format: str = "markdown") -> List[Tuple[str, str]]:
+    """Convert an HTML document to (title, text) sections by streaming it through HTMLToText."""
+    parser = HTMLToText(markdown=format == "markdown")
+    for start in range(0, len(html), CONVERT_CHUNK_SIZE):
+        parser.feed(html[start:start + CONVERT_CHUNK_SIZE])
+    parser.close()
+    return parser.get_sections()
+
+def check_format(format: str) -> None:
+    """Validate a content format argument."""
+    if format not in CONTENT_FORMATS:
+        raise ValueError(f"Unsupported format: {format} (expected one of {', '.join(CONTENT_FORMATS)})")
+
+def check_max_chars(max_chars: int) -> None:
+    """Validate a max_chars argument."""
+    if max_chars < 1:
+        raise ValueError(f"max_chars must be at least 1, got {max_chars}")
+
+class ContentCache:
+    """
+    In-process LRU cache of converted documents, bounded by total characters.
+    
+    Kept apart from the shared state backend so conversions never evict
+    cached Canvas responses or rate-limit counters.
+    """
+    
+    def __init__(self, max_chars: int, ttl: float):
+        self.max_chars = max_chars
+        self.ttl = ttl
+        self.total_chars = 0
+        self._data: "OrderedDict[str, Tuple[float, int, List[Tuple[str, str]]]]" = OrderedDict()
+    
+    def get(self, key: str) -> Optional[List[Tuple[str, str]]]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, _, sections = entry
+        if time.monotonic() >= expires_at:
+            self._remove(key)
+            return None
+        self._data.move_to_end(key)
+        return sections
+    
+    def set(self, key: str, sections: List[Tuple[str, str]]) -> None:
+        size = sum(len(title) + len(text) for title, text in sections)
+        if size > min(self.max_chars, CONTENT_CACHE_MAX_CHARS):
+            return
+        self._remove(key)
+        self._data[key] = (time.monotonic() + self.ttl, size, sections)
+        self.total_chars += size
+        while self.total_chars > self.max_chars:
+            self._remove(next(iter(self._data)))
+    
+    def _remove(self, key: str) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.total_chars -= entry[1]
+
+_content_cache = ContentCache(CONTENT_CACHE_TOTAL_CHARS, CONTENT_CACHE_TTL)
+_content_pool: Optional[ThreadPoolExecutor] = None
+
+def get_content_pool() -> ThreadPoolExecutor:
+    """Get the worker pool used to convert large documents off the event loop."""
+    global _content_pool
+    if _content_pool is None:
+        _content_pool = ThreadPoolExecutor(max_workers=CONTENT_WORKERS, thread_name_prefix="content")
+    return _content_pool
+
+async def render_html(
+    kind: str,
+    content_id: Any,
+    version: Optional[str],
+    html: Optional[str],
+    format: str,
+    cache: bool = True
+) -> List[Tuple[str, str]]:
+    """
+    Convert Canvas HTML to (title, text) sections, caching the result.
+    
+    Conversions are cached in the content cache keyed by content id and
+    version (Canvas `updated_at`, or a hash of the HTML when there is none),
+    so repeat reads of unchanged content do no conversion work.
+    """
+    check_format(format)
+    if not html:
+        return []
+    if format == "html":
+        return [("(untitled)", html)]
+    
+    key = None
+    if cache:
+        if not version:
+            version = hashlib.sha256(html.encode()).hexdigest()[:16]
+        key = f"{token_fingerprint()}:{kind}:{content_id}:{version}:{format}"
+        cached = _content_cache.get(key)
+        if cached is not None:
+            return cached
+    
+    if len(html) > CONTENT_OFFLOAD_CHARS:
+        loop = asyncio.get_running_loop()
+        sections = await loop.run_in_executor(get_content_pool(), convert_html, html, format)
+    else:
+        sections = convert_html(html, format)
+    
+    if key is not None:
+        _content_cache.set(key, sections)
+    return sections
+
+def content_view(
+    sections: List[Tuple[str, str]],
+    section: Optional[int],
+    max_chars: int
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Select one section (or the whole document) and cut it to max_chars.
+    
+    Returns the text and metadata describing the available sections, so
+    callers can page through a long document one section at a time.
+    """
+    check_max_chars(max_chars)
+    if section is None:
+        text = "\n\n".join(body for _, body in sections)
+    elif 0 <= section < len(sections):
+        text = sections[section][1]
+    else:
+        raise ValueError(f"section must be between 0 and {len(sections) - 1}")
+    
+    return text[:max_chars], {
+        "section": section,
+        "sections": [title for title, _ in sections],
+        "truncated": len(text) > max_chars,
+        "total_chars": len(text)
+    }
+
+async def convert_message_field(
+    item: Dict[str, Any],
+    field: str,
+    kind: str,
+    version: Optional[str],
+    format: str,
+    max_chars: int
+) -> None:
+    """
+    Convert one HTML field of a message in place, flagging it when cut to max_chars.
+    
+    Only messages above CONTENT_OFFLOAD_CHARS are cached; converting a short
+    message is cheaper than a cache entry. Plain-text messages are left as
+    they are, since conversion would collapse their line breaks.
+    """
+    check_max_chars(max_chars)
+    if format == "html" or not item.get(field):
+        return
+    text = item[field]
+    if HTML_MARKUP.search(text):
+        sections = await render_html(kind, item.get("id"), version, text, format, cache=len(text) > CONTENT_OFFLOAD_CHARS)
+        text = "\n\n".join(body for _, body in sections)
+    item[field] = text[:max_chars]
+    if len(text) > max_chars:
+        item[f"{field}_truncated"] = True
+
+# ===== TOOL REGISTRATION =====
+
+_tool_specs: List[Tuple[Any, Dict[str, Any]]] = []
+_tools_lock = threading.Lock()
+_tools_registered = False
+
+def canvas_tool(**kwargs):
+    """
+    Declare an MCP tool.
+    
+    Tools are registered with FastMCP immediately, or in fast-startup mode
+    collected and registered after the server is listening, which moves the
+    schema generation for every tool off the cold-start path.
+    """
+    def decorator(fn):
+        if MCP_FAST_STARTUP and not _tools_registered:
+            _tool_specs.append((fn, kwargs))
+        else:
+            mcp.tool(**kwargs)(fn)
+        return fn
+    return decorator
+
+def register_tools() -> None:
+    """Register deferred tools with FastMCP; safe to call repeatedly from any thread."""
+    global _tools_registered
+    with _tools_lock:
+        if _tools_registered:
+            return
+        started = time.perf_counter()
+        for fn, kwargs in _tool_specs:
+            mcp.tool(**kwargs)(fn)
+        _tool_specs.clear()
+        _tools_registered = True
+        STARTUP_TIMINGS["deferred_tool_registration"] = round((time.perf_counter() - started) * 1000, 1)
+
+class DeferredToolsMiddleware(Middleware):
+    """Finish deferred tool registration before tools are listed or called."""
+    
+    async def on_list_tools(self, context, call_next):
+        if not _tools_registered:
+            await asyncio.to_thread(register_tools)
+        return await call_next(context)
+    
+    async def on_call_tool(self, context, call_next):
+        if not _tools_registered:
+            await asyncio.to_thread(register_tools)
+        return await call_next(context)
+
+def warm_up() -> None:
+    """Import httpx, build the Canvas client and register deferred tools in the background."""
+    started = time.perf_counter()
+    get_client()
+    STARTUP_TIMINGS["deferred_client_setup"] = round((time.perf_counter() - started) * 1000, 1)
+    register_tools()
+
+def start_warm_up() -> None:
+    """Run warm_up on a daemon thread so it overlaps with the MCP handshake."""
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+if MCP_FAST_STARTUP:
+    mcp.add_middleware(DeferredToolsMiddleware())
+
+mark_startup_phase("setup")
+
 # ===== COURSE MANAGEMENT TOOLS =====
 
-@mcp.tool(description="List all courses the current user is enrolled in. Returns course ID, name, course code, enrollment status, and term.")
+@canvas_tool(description="List all courses the current user is enrolled in. Returns course ID, name, course code, enrollment status, and term.")
 async def list_courses(
     enrollment_state: str = "active",
     include: Optional[str] = None
@@ -71,7 +1128,7 @@ async def list_courses(
     courses = await make_canvas_request("GET", "courses", params=params)
     return courses
 
-@mcp.tool(description="Get detailed information about a specific course including description, syllabus, and settings.")
+@canvas_tool(description="Get detailed information about a specific course including description, syllabus, and settings.")
 async def get_course(course_id: int, include: Optional[str] = None) -> Dict[str, Any]:
     """
     Get details for a specific course.
@@ -87,19 +1144,41 @@ async def get_course(course_id: int, include: Optional[str] = None) -> Dict[str,
     course = await make_canvas_request("GET", f"courses/{course_id}", params=params)
     return course
 
-@mcp.tool(description="Get the syllabus for a specific course.")
-async def get_course_syllabus(course_id: int) -> Dict[str, Any]:
-    """Get the syllabus body for a course."""
-    course = await make_canvas_request("GET", f"courses/{course_id}", params={"include[]": "syllabus_body"})
-    return {
+@canvas_tool(description="Get the syllabus for a specific course as markdown (default), plain text or raw HTML. Long syllabi can be read one section at a time. May return a cached copy flagged with 'stale' and 'stale_age_seconds' while Canvas is degraded.")
+async def get_course_syllabus(
+    course_id: int,
+    format: str = "markdown",
+    section: Optional[int] = None,
+    max_chars: int = CONTENT_MAX_CHARS
+) -> Dict[str, Any]:
+    """
+    Get the syllabus body for a course.
+    
+    Args:
+        course_id: The Canvas course ID
+        format: Body format (markdown, text, html)
+        section: Index into 'sections' to return only that part of the syllabus
+        max_chars: Maximum number of characters of the body to return
+    """
+    check_format(format)
+    check_max_chars(max_chars)
+    course, stale_age = await make_cached_canvas_request(
+        f"courses/{course_id}", params={"include[]": "syllabus_body"}, ttl=300, max_stale=86400
+    )
+    result = {
         "course_id": course_id,
         "course_name": course.get("name"),
         "syllabus_body": course.get("syllabus_body", "No syllabus available")
     }
+    if course.get("syllabus_body") and format != "html":
+        sections = await render_html("syllabus", course_id, course.get("updated_at"), course["syllabus_body"], format)
+        text, view = content_view(sections, section, max_chars)
+        result.update({"syllabus_body": text, "body_format": format, **view})
+    return mark_stale(result, stale_age)
 
 # ===== ASSIGNMENT TOOLS =====
 
-@mcp.tool(description="List all assignments in a course with their due dates, points, and submission status.")
+@canvas_tool(description="List all assignments in a course with their due dates, points, and submission status.")
 async def list_assignments(
     course_id: int,
     include: Optional[str] = None,
@@ -120,7 +1199,7 @@ async def list_assignments(
     assignments = await make_canvas_request("GET", f"courses/{course_id}/assignments", params=params)
     return assignments
 
-@mcp.tool(description="Get detailed information about a specific assignment including description, due date, and submission requirements.")
+@canvas_tool(description="Get detailed information about a specific assignment including description, due date, and submission requirements.")
 async def get_assignment(
     course_id: int,
     assignment_id: int,
@@ -141,7 +1220,7 @@ async def get_assignment(
     assignment = await make_canvas_request("GET", f"courses/{course_id}/assignments/{assignment_id}", params=params)
     return assignment
 
-@mcp.tool(description="Submit an assignment with text content or a URL. Use this to turn in homework.")
+@canvas_tool(description="Submit an assignment with text content or a URL. Use this to turn in homework.")
 async def submit_assignment(
     course_id: int,
     assignment_id: int,
@@ -171,9 +1250,11 @@ async def submit_assignment(
         data["submission"]["url"] = url
     
     submission = await make_canvas_request("POST", f"courses/{course_id}/assignments/{assignment_id}/submissions", data=data)
+    # Submitting can complete a module requirement
+    await invalidate_cached(f"courses/{course_id}/modules")
     return submission
 
-@mcp.tool(description="Get submission details for an assignment including grade, comments, and submitted content.")
+@canvas_tool(description="Get submission details for an assignment including grade, comments, and submitted content.")
 async def get_submission(
     course_id: int,
     assignment_id: int,
@@ -198,8 +1279,8 @@ async def get_submission(
 
 # ===== MODULE TOOLS =====
 
-@mcp.tool(description="List all modules in a course with their names, positions, and completion requirements.")
-async def list_modules(course_id: int, include: Optional[str] = None) -> List[Dict[str, Any]]:
+@canvas_tool(description="List all modules in a course with their names, positions, and completion requirements. While Canvas is degraded, may return a cached copy as {'items': [...], 'stale': true, 'stale_age_seconds': N}.")
+async def list_modules(course_id: int, include: Optional[str] = None) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
     List all modules in a course.
     
@@ -211,10 +1292,12 @@ async def list_modules(course_id: int, include: Optional[str] = None) -> List[Di
     if include:
         params["include[]"] = include.split(",")
     
-    modules = await make_canvas_request("GET", f"courses/{course_id}/modules", params=params)
-    return modules
+    modules, stale_age = await make_cached_canvas_request(
+        f"courses/{course_id}/modules", params=params, ttl=120, max_stale=21600
+    )
+    return mark_stale(modules, stale_age)
 
-@mcp.tool(description="Get all items within a specific module including pages, assignments, quizzes, and files.")
+@canvas_tool(description="Get all items within a specific module including pages, assignments, quizzes, and files.")
 async def get_module_items(
     course_id: int,
     module_id: int,
@@ -235,7 +1318,7 @@ async def get_module_items(
     items = await make_canvas_request("GET", f"courses/{course_id}/modules/{module_id}/items", params=params)
     return items
 
-@mcp.tool(description="Mark a module item as completed. This tracks your progress through course modules.")
+@canvas_tool(description="Mark a module item as completed. This tracks your progress through course modules.")
 async def mark_module_item_done(
     course_id: int,
     module_id: int,
@@ -250,11 +1333,13 @@ async def mark_module_item_done(
         item_id: The module item ID
     """
     result = await make_canvas_request("PUT", f"courses/{course_id}/modules/{module_id}/items/{item_id}/done")
+    # list_modules may include completion state, so drop its cached copies
+    await invalidate_cached(f"courses/{course_id}/modules")
     return result
 
 # ===== DISCUSSION TOOLS =====
 
-@mcp.tool(description="List all discussion topics in a course including titles, authors, and reply counts.")
+@canvas_tool(description="List all discussion topics in a course including titles, authors, and reply counts.")
 async def list_discussions(
     course_id: int,
     order_by: str = "position",
@@ -275,19 +1360,34 @@ async def list_discussions(
     discussions = await make_canvas_request("GET", f"courses/{course_id}/discussion_topics", params=params)
     return discussions
 
-@mcp.tool(description="Get detailed information about a discussion topic including the full message and all replies.")
-async def get_discussion(course_id: int, topic_id: int) -> Dict[str, Any]:
+@canvas_tool(description="Get detailed information about a discussion topic including the full message and all replies. Messages are returned as markdown (default), plain text or raw HTML.")
+async def get_discussion(
+    course_id: int,
+    topic_id: int,
+    format: str = "markdown",
+    max_chars: int = CONTENT_MAX_CHARS
+) -> Dict[str, Any]:
     """
     Get a specific discussion topic with full view.
     
     Args:
         course_id: The Canvas course ID
         topic_id: The discussion topic ID
+        format: Message format (markdown, text, html)
+        max_chars: Maximum number of characters returned per message
     """
+    check_format(format)
+    check_max_chars(max_chars)
     discussion = await make_canvas_request("GET", f"courses/{course_id}/discussion_topics/{topic_id}/view")
+    
+    entries = list(discussion.get("view", [])) + list(discussion.get("new_entries", []))
+    while entries:
+        entry = entries.pop()
+        await convert_message_field(entry, "message", "discussion_entry", entry.get("updated_at"), format, max_chars)
+        entries.extend(entry.get("replies", []))
     return discussion
 
-@mcp.tool(description="Post a reply to a discussion topic. Use this to participate in class discussions.")
+@canvas_tool(description="Post a reply to a discussion topic. Use this to participate in class discussions.")
 async def create_discussion_entry(
     course_id: int,
     topic_id: int,
@@ -310,11 +1410,13 @@ async def create_discussion_entry(
         endpoint = f"courses/{course_id}/discussion_topics/{topic_id}/entries/{parent_id}/replies"
     
     entry = await make_canvas_request("POST", endpoint, data=data)
+    # Contributing can complete a module requirement
+    await invalidate_cached(f"courses/{course_id}/modules")
     return entry
 
 # ===== QUIZ TOOLS =====
 
-@mcp.tool(description="List all quizzes in a course with their due dates, time limits, and question counts.")
+@canvas_tool(description="List all quizzes in a course with their due dates, time limits, and question counts.")
 async def list_quizzes(course_id: int) -> List[Dict[str, Any]]:
     """
     List all quizzes in a course.
@@ -325,7 +1427,7 @@ async def list_quizzes(course_id: int) -> List[Dict[str, Any]]:
     quizzes = await make_canvas_request("GET", f"courses/{course_id}/quizzes")
     return quizzes
 
-@mcp.tool(description="Get detailed information about a specific quiz including instructions and settings.")
+@canvas_tool(description="Get detailed information about a specific quiz including instructions and settings.")
 async def get_quiz(course_id: int, quiz_id: int) -> Dict[str, Any]:
     """
     Get details for a specific quiz.
@@ -337,7 +1439,7 @@ async def get_quiz(course_id: int, quiz_id: int) -> Dict[str, Any]:
     quiz = await make_canvas_request("GET", f"courses/{course_id}/quizzes/{quiz_id}")
     return quiz
 
-@mcp.tool(description="Start a quiz submission. This begins a timed quiz attempt.")
+@canvas_tool(description="Start a quiz submission. This begins a timed quiz attempt.")
 async def start_quiz_submission(course_id: int, quiz_id: int) -> Dict[str, Any]:
     """
     Start a quiz submission (quiz-taking session).
@@ -349,7 +1451,7 @@ async def start_quiz_submission(course_id: int, quiz_id: int) -> Dict[str, Any]:
     submission = await make_canvas_request("POST", f"courses/{course_id}/quizzes/{quiz_id}/submissions")
     return submission
 
-@mcp.tool(description="Get questions for a quiz submission. Use this to see quiz questions during an attempt.")
+@canvas_tool(description="Get questions for a quiz submission. Use this to see quiz questions during an attempt.")
 async def get_quiz_questions(course_id: int, quiz_id: int, submission_id: int) -> List[Dict[str, Any]]:
     """
     Get questions for a quiz submission.
@@ -362,7 +1464,7 @@ async def get_quiz_questions(course_id: int, quiz_id: int, submission_id: int) -
     questions = await make_canvas_request("GET", f"courses/{course_id}/quizzes/{quiz_id}/submissions/{submission_id}/questions")
     return questions
 
-@mcp.tool(description="Answer a quiz question. Submit your answer during a quiz attempt.")
+@canvas_tool(description="Answer a quiz question. Submit your answer during a quiz attempt.")
 async def answer_quiz_question(
     course_id: int,
     quiz_id: int,
@@ -392,7 +1494,7 @@ async def answer_quiz_question(
     result = await make_canvas_request("POST", f"courses/{course_id}/quizzes/{quiz_id}/submissions/{submission_id}/questions", data=data)
     return result
 
-@mcp.tool(description="Complete and submit a quiz. This finalizes your quiz attempt.")
+@canvas_tool(description="Complete and submit a quiz. This finalizes your quiz attempt.")
 async def complete_quiz_submission(
     course_id: int,
     quiz_id: int,
@@ -407,11 +1509,13 @@ async def complete_quiz_submission(
         submission_id: The quiz submission ID
     """
     result = await make_canvas_request("POST", f"courses/{course_id}/quizzes/{quiz_id}/submissions/{submission_id}/complete")
+    # Completing a quiz can satisfy a module requirement
+    await invalidate_cached(f"courses/{course_id}/modules")
     return result
 
 # ===== GRADE TOOLS =====
 
-@mcp.tool(description="Get all grades for a specific course including current score and grade breakdown.")
+@canvas_tool(description="Get all grades for a specific course including current score and grade breakdown.")
 async def get_course_grades(course_id: int, user_id: str = "self") -> Dict[str, Any]:
     """
     Get grades for a course.
@@ -423,7 +1527,7 @@ async def get_course_grades(course_id: int, user_id: str = "self") -> Dict[str,
     enrollments = await make_canvas_request("GET", f"courses/{course_id}/enrollments", params={"user_id": user_id})
     return enrollments
 
-@mcp.tool(description="Get all assignments with their grades for the current user in a course.")
+@canvas_tool(description="Get all assignments with their grades for the current user in a course.")
 async def get_user_assignments_with_grades(course_id: int) -> List[Dict[str, Any]]:
     """
     Get all assignments with submission and grade information for current user.
@@ -440,7 +1544,7 @@ async def get_user_assignments_with_grades(course_id: int) -> List[Dict[str, Any
 
 # ===== FILE AND CONTENT TOOLS =====
 
-@mcp.tool(description="List all files in a course including names, sizes, and download URLs.")
+@canvas_tool(description="List all files in a course including names, sizes, and download URLs.")
 async def list_course_files(
     course_id: int,
     search_term: Optional[str] = None,
@@ -463,7 +1567,7 @@ async def list_course_files(
     files = await make_canvas_request("GET", f"courses/{course_id}/files", params=params)
     return files
 
-@mcp.tool(description="Get detailed information about a specific file including download URL and metadata.")
+@canvas_tool(description="Get detailed information about a specific file including download URL and metadata.")
 async def get_file(file_id: int) -> Dict[str, Any]:
     """
     Get details for a specific file.
@@ -474,7 +1578,7 @@ async def get_file(file_id: int) -> Dict[str, Any]:
     file_info = await make_canvas_request("GET", f"files/{file_id}")
     return file_info
 
-@mcp.tool(description="List all folders in a course to browse course file organization.")
+@canvas_tool(description="List all folders in a course to browse course file organization.")
 async def list_course_folders(course_id: int) -> List[Dict[str, Any]]:
     """
     List folders in a course.
@@ -487,7 +1591,7 @@ async def list_course_folders(course_id: int) -> List[Dict[str, Any]]:
 
 # ===== ANNOUNCEMENT TOOLS =====
 
-@mcp.tool(description="List all announcements in a course with their titles and posted dates.")
+@canvas_tool(description="List all announcements in a course with their titles and posted dates.")
 async def list_announcements(
     course_id: int,
     start_date: Optional[str] = None,
@@ -512,7 +1616,7 @@ async def list_announcements(
 
 # ===== CALENDAR TOOLS =====
 
-@mcp.tool(description="List calendar events including assignments, quizzes, and other due dates.")
+@canvas_tool(description="List calendar events including assignments, quizzes, and other due dates.")
 async def list_calendar_events(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
@@ -537,7 +1641,7 @@ async def list_calendar_events(
     events = await make_canvas_request("GET", "calendar_events", params=params)
     return events
 
-@mcp.tool(description="Get detailed information about a specific calendar event.")
+@canvas_tool(description="Get detailed information about a specific calendar event.")
 async def get_calendar_event(event_id: int) -> Dict[str, Any]:
     """
     Get details for a specific calendar event.
@@ -550,25 +1654,25 @@ async def get_calendar_event(event_id: int) -> Dict[str, Any]:
 
 # ===== USER PROFILE TOOLS =====
 
-@mcp.tool(description="Get the current user's profile information including name, email, and avatar.")
+@canvas_tool(description="Get the current user's profile information including name, email, and avatar.")
 async def get_user_profile() -> Dict[str, Any]:
     """Get the current user's profile."""
     profile = await make_canvas_request("GET", "users/self/profile")
     return profile
 
-@mcp.tool(description="Get all course enrollments for the current user including role and enrollment state.")
+@canvas_tool(description="Get all course enrollments for the current user including role and enrollment state.")
 async def get_user_enrollments() -> List[Dict[str, Any]]:
     """Get enrollments for the current user."""
     enrollments = await make_canvas_request("GET", "users/self/enrollments")
     return enrollments
 
-@mcp.tool(description="Get upcoming assignments and events across all courses for the current user.")
+@canvas_tool(description="Get upcoming assignments and events across all courses for the current user.")
 async def get_upcoming_assignments() -> List[Dict[str, Any]]:
     """Get upcoming assignments for the current user."""
     upcoming = await make_canvas_request("GET", "users/self/upcoming_events")
     return upcoming
 
-@mcp.tool(description="Get recent activity and notifications for the current user.")
+@canvas_tool(description="Get recent activity and notifications for the current user.")
 async def get_user_activity_stream() -> List[Dict[str, Any]]:
     """Get the activity stream for the current user."""
     stream = await make_canvas_request("GET", "users/self/activity_stream")
@@ -576,12 +1680,12 @@ async def get_user_activity_stream() -> List[Dict[str, Any]]:
 
 # ===== PAGE TOOLS =====
 
-@mcp.tool(description="List all pages in a course including titles and URLs.")
+@canvas_tool(description="List all pages in a course including titles and URLs. While Canvas is degraded, may return a cached copy as {'items': [...], 'stale': true, 'stale_age_seconds': N}.")
 async def list_pages(
     course_id: int,
     sort: str = "title",
     order: str = "asc"
-) -> List[Dict[str, Any]]:
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
     List pages in a course.
     
@@ -591,30 +1695,47 @@ async def list_pages(
         order: Sort order (asc, desc)
     """
     params = {"sort": sort, "order": order}
-    pages = await make_canvas_request("GET", f"courses/{course_id}/pages", params=params)
-    return pages
+    pages, stale_age = await make_cached_canvas_request(
+        f"courses/{course_id}/pages", params=params, ttl=120, max_stale=21600
+    )
+    return mark_stale(pages, stale_age)
 
-@mcp.tool(description="Get the content of a specific page in a course.")
-async def get_page(course_id: int, page_url: str) -> Dict[str, Any]:
+@canvas_tool(description="Get the content of a specific page in a course as markdown (default), plain text or raw HTML. Long pages can be read one section at a time.")
+async def get_page(
+    course_id: int,
+    page_url: str,
+    format: str = "markdown",
+    section: Optional[int] = None,
+    max_chars: int = CONTENT_MAX_CHARS
+) -> Dict[str, Any]:
     """
     Get a specific page.
     
     Args:
         course_id: The Canvas course ID
         page_url: The page URL or ID
+        format: Body format (markdown, text, html)
+        section: Index into 'sections' to return only that part of the page
+        max_chars: Maximum number of characters of the body to return
     """
+    check_format(format)
+    check_max_chars(max_chars)
     page = await make_canvas_request("GET", f"courses/{course_id}/pages/{page_url}")
+    if page.get("body") and format != "html":
+        sections = await render_html("page", page.get("page_id", page_url), page.get("updated_at"), page["body"], format)
+        text, view = content_view(sections, section, max_chars)
+        page.update({"body": text, "body_format": format, **view})
     return page
 
 # ===== GROUP TOOLS =====
 
-@mcp.tool(description="List all groups the current user is a member of.")
+@canvas_tool(description="List all groups the current user is a member of.")
 async def list_user_groups() -> List[Dict[str, Any]]:
     """List groups for the current user."""
     groups = await make_canvas_request("GET", "users/self/groups")
     return groups
 
-@mcp.tool(description="Get details about a specific group including members and description.")
+@canvas_tool(description="Get details about a specific group including members and description.")
 async def get_group(group_id: int, include: Optional[str] = None) -> Dict[str, Any]:
     """
     Get details for a specific group.
@@ -632,7 +1753,7 @@ async def get_group(group_id: int, include: Optional[str] = None) -> Dict[str, A
 
 # ===== TODO ITEMS =====
 
-@mcp.tool(description="Get all to-do items for the current user including assignments and other tasks.")
+@canvas_tool(description="Get all to-do items for the current user including assignments and other tasks.")
 async def get_todo_items() -> List[Dict[str, Any]]:
     """Get to-do items for the current user."""
     todos = await make_canvas_request("GET", "users/self/todo")
@@ -640,7 +1761,7 @@ async def get_todo_items() -> List[Dict[str, Any]]:
 
 # ===== CONVERSATION TOOLS =====
 
-@mcp.tool(description="List all conversations (messages) for the current user.")
+@canvas_tool(description="List all conversations (messages) for the current user.")
 async def list_conversations(scope: str = "inbox") -> List[Dict[str, Any]]:
     """
     List conversations for the current user.
@@ -652,18 +1773,29 @@ async def list_conversations(scope: str = "inbox") -> List[Dict[str, Any]]:
     conversations = await make_canvas_request("GET", "conversations", params=params)
     return conversations
 
-@mcp.tool(description="Get details about a specific conversation including all messages.")
-async def get_conversation(conversation_id: int) -> Dict[str, Any]:
+@canvas_tool(description="Get details about a specific conversation including all messages. Messages are returned as markdown (default), plain text or raw HTML.")
+async def get_conversation(
+    conversation_id: int,
+    format: str = "markdown",
+    max_chars: int = CONTENT_MAX_CHARS
+) -> Dict[str, Any]:
     """
     Get a specific conversation.
     
     Args:
         conversation_id: The conversation ID
+        format: Message format (markdown, text, html)
+        max_chars: Maximum number of characters returned per message
     """
+    check_format(format)
+    check_max_chars(max_chars)
     conversation = await make_canvas_request("GET", f"conversations/{conversation_id}")
+    for message in conversation.get("messages", []):
+        # Conversation messages are never edited, so created_at identifies the version
+        await convert_message_field(message, "body", "conversation_message", message.get("created_at"), format, max_chars)
     return conversation
 
-@mcp.tool(description="Send a message to other users in Canvas.")
+@canvas_tool(description="Send a message to other users in Canvas.")
 async def create_conversation(
     recipients: str,
     subject: str,
@@ -692,7 +1824,7 @@ async def create_conversation(
 
 # ===== RUBRIC TOOLS =====
 
-@mcp.tool(description="Get the rubric for an assignment to understand grading criteria.")
+@canvas_tool(description="Get the rubric for an assignment to understand grading criteria.")
 async def get_assignment_rubric(course_id: int, assignment_id: int) -> Dict[str, Any]:
     """
     Get the rubric for an assignment.
@@ -715,7 +1847,7 @@ async def get_assignment_rubric(course_id: int, assignment_id: int) -> Dict[str,
 
 # ===== OUTCOME TOOLS =====
 
-@mcp.tool(description="List learning outcomes for a course.")
+@canvas_tool(description="List learning outcomes for a course.")
 async def list_course_outcomes(course_id: int) -> List[Dict[str, Any]]:
     """
     List outcomes for a course.
@@ -728,7 +1860,7 @@ async def list_course_outcomes(course_id: int) -> List[Dict[str, Any]]:
 
 # ===== SERVER INFO =====
 
-@mcp.tool(description="Get information about this Canvas MCP server including version and configuration.")
+@canvas_tool(description="Get information about this Canvas MCP server including version and configuration.")
 def get_server_info() -> dict:
     """Get information about the Canvas MCP server."""
     return {
@@ -738,20 +1870,121 @@ def get_server_info() -> dict:
         "canvas_api_url": CANVAS_API_URL,
         "api_token_configured": bool(CANVAS_API_TOKEN),
         "environment": os.environ.get("ENVIRONMENT", "development"),
+        "circuit_breakers": {key: breaker.state for key, breaker in _breakers.items()},
+        "workers": MCP_WORKERS,
+        "cache_backend": CACHE_BACKEND,
+        "worker_pid": os.getpid(),
+        "fast_startup": MCP_FAST_STARTUP,
+        "startup_timings_ms": STARTUP_TIMINGS,
         "python_version": os.sys.version.split()[0]
     }
 
+mark_startup_phase("tool_definitions")
+
+def create_app():
+    """Build the ASGI app; used as the uvicorn factory for each worker process."""
+    start_warm_up()
+    return mcp.http_app(stateless_http=True)
+
+def benchmark_startup(
+    runs: int,
+    budget_ms: float = MCP_STARTUP_BUDGET_MS,
+    phase_budget_ms: float = MCP_STARTUP_PHASE_BUDGET_MS
+) -> int:
+    """
+    Import the server in fresh interpreters and gate on import time.
+    
+    Returns a non-zero exit code when the median import time exceeds the
+    budget. In fast-startup mode it also fails when the server's own phases
+    (setup and tool_definitions) exceed phase_budget_ms, which catches tool
+    registration or other work moving back onto the cold-start path, or
+    when httpx is imported eagerly again.
+    """
+    import statistics
+    import subprocess
+    
+    probe = (
+        "import time, json, sys; started = time.perf_counter(); import server; "
+        "print(json.dumps({'total': round((time.perf_counter() - started) * 1000, 1), "
+        "'httpx_imported': 'httpx' in sys.modules, **server.STARTUP_TIMINGS}))"
+    )
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", probe],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout
+        samples.append(json.loads(output.splitlines()[-1]))
+    
+    print(f"Startup benchmark ({runs} runs, fast startup: {MCP_FAST_STARTUP})")
+    phases = [key for key in samples[0] if key != "httpx_imported"]
+    for phase in phases:
+        print(f"  {phase:<20} {statistics.median(sample[phase] for sample in samples):>8.1f} ms")
+    
+    total = statistics.median(sample["total"] for sample in samples)
+    if total > budget_ms:
+        print(f"FAIL: median import time {total:.1f} ms exceeds budget of {budget_ms:.0f} ms")
+        return 1
+    if MCP_FAST_STARTUP:
+        own = statistics.median(sample["setup"] + sample["tool_definitions"] for sample in samples)
+        if own > phase_budget_ms:
+            print(f"FAIL: setup and tool_definitions took {own:.1f} ms, over the budget of {phase_budget_ms:.0f} ms")
+            return 1
+        if any(sample["httpx_imported"] for sample in samples):
+            print("FAIL: httpx is imported at startup in fast-startup mode")
+            return 1
+    print(f"OK: median import time {total:.1f} ms within budget of {budget_ms:.0f} ms")
+    return 0
+
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Canvas LMS MCP Server")
+    parser.add_argument("--benchmark-startup", action="store_true", help="measure import time and exit non-zero if it exceeds the budget")
+    parser.add_argument("--runs", type=int, default=5, help="number of benchmark runs")
+    parser.add_argument("--budget-ms", type=float, default=MCP_STARTUP_BUDGET_MS, help="maximum median import time in milliseconds")
+    parser.add_argument("--phase-budget-ms", type=float, default=MCP_STARTUP_PHASE_BUDGET_MS, help="maximum median time of the server's own startup phases in fast-startup mode")
+    args = parser.parse_args()
+    if args.benchmark_startup:
+        sys.exit(benchmark_startup(args.runs, args.budget_ms, args.phase_budget_ms))
+    
     port = int(os.environ.get("PORT", 8000))
     host = "0.0.0.0"
     
     print(f"Starting Canvas LMS MCP Server on {host}:{port}")
     print(f"Canvas API URL: {CANVAS_API_URL}")
     print(f"API Token configured: {bool(CANVAS_API_TOKEN)}")
+    print(f"Workers: {MCP_WORKERS}, cache backend: {CACHE_BACKEND}")
+    print("Startup timings (ms): " + ", ".join(f"{phase}={ms}" for phase, ms in STARTUP_TIMINGS.items()))
     
-    mcp.run(
-        transport="http",
-        host=host,
-        port=port,
-        stateless_http=True
-    )
+    if MCP_WORKERS > 1:
+        import uvicorn
+        
+        if CACHE_BACKEND == "memory":
+            if CANVAS_RATE_LIMIT > 0:
+                sys.exit(
+                    "CANVAS_RATE_LIMIT needs CACHE_BACKEND=redis when MCP_WORKERS > 1; "
+                    "with the memory backend every worker would allow the full limit"
+                )
+            print("Warning: CACHE_BACKEND=memory keeps a separate cache in each worker; use redis to share it")
+        
+        # Workers resolve the factory through the `server` alias registered at import time
+        uvicorn.run(
+            "server:create_app",
+            factory=True,
+            host=host,
+            port=port,
+            workers=MCP_WORKERS,
+            app_dir=os.path.dirname(os.path.abspath(__file__))
+        )
+    else:
+        start_warm_up()
+        mcp.run(
+            transport="http",
+            host=host,
+            port=port,
+            stateless_http=True
+        )
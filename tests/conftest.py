@@ -0,0 +1,53 @@
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import server
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class CanvasStub:
+    """Fault-injecting stand-in for Canvas, served through httpx.MockTransport."""
+
+    def __init__(self):
+        self.requests = []
+        self.handler = lambda request: httpx.Response(200, json={})
+
+    async def __call__(self, request):
+        self.requests.append(request)
+        response = self.handler(request)
+        if hasattr(response, "__await__"):
+            response = await response
+        return response
+
+    def calls(self, method=None):
+        return [r for r in self.requests if method is None or r.method == method]
+
+
+@pytest.fixture
+def canvas(monkeypatch):
+    """
+    Point make_canvas_request at a CanvasStub with fresh server state.
+
+    Retries sleep for zero seconds and client-side throttling is off unless
+    a test turns it back on.
+    """
+    stub = CanvasStub()
+    monkeypatch.setattr(server, "CANVAS_API_URL", "https://canvas.test/api/v1")
+    monkeypatch.setattr(server, "CANVAS_API_TOKEN", "test-token")
+    monkeypatch.setattr(server, "CANVAS_RETRY_BACKOFF", 0)
+    monkeypatch.setattr(server, "CANVAS_RATE_LIMIT", 0)
+    monkeypatch.setattr(server, "_client", httpx.AsyncClient(transport=httpx.MockTransport(stub)))
+    monkeypatch.setattr(server, "_breakers", {})
+    monkeypatch.setattr(server, "_latencies", {})
+    monkeypatch.setattr(server, "_refreshing", {})
+    monkeypatch.setattr(server, "_backend", server.MemoryBackend())
+    return stub
@@ -0,0 +1,76 @@
+import re
+import time
+
+
+def glob_to_regex(pattern):
+    """Translate a Redis glob (with backslash escapes) into a regex."""
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern):
+            i += 1
+            regex += re.escape(pattern[i])
+        elif char == "*":
+            regex += ".*"
+        elif char == "?":
+            regex += "."
+        else:
+            regex += re.escape(char)
+        i += 1
+    return re.compile(regex + r"\Z", re.DOTALL)
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of the redis.asyncio client RedisBackend uses."""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = 0
+
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self.data[key]
+            return None
+        return value
+
+    async def get(self, key):
+        self.commands += 1
+        return self._live(key)
+
+    async def set(self, key, value, px=None, nx=False):
+        self.commands += 1
+        if nx and self._live(key) is not None:
+            return None
+        self.data[key] = (time.monotonic() + px / 1000 if px else None, value)
+        return True
+
+    async def incr(self, key):
+        self.commands += 1
+        value = self._live(key)
+        count = int(value or 0) + 1
+        expires_at = self.data[key][0] if value is not None else None
+        self.data[key] = (expires_at, str(count))
+        return count
+
+    async def pexpire(self, key, px):
+        self.commands += 1
+        value = self._live(key)
+        if value is None:
+            return False
+        self.data[key] = (time.monotonic() + px / 1000, value)
+        return True
+
+    async def delete(self, *keys):
+        self.commands += 1
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def scan_iter(self, match):
+        regex = glob_to_regex(match)
+        for key in list(self.data):
+            if self._live(key) is not None and regex.match(key):
+                yield key
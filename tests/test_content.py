@@ -0,0 +1,179 @@
+import httpx
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def content_cache(monkeypatch):
+    cache = server.ContentCache(max_chars=10_000, ttl=60)
+    monkeypatch.setattr(server, "_content_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def conversions(monkeypatch):
+    calls = []
+    convert = server.convert_html
+
+    def counting_convert(html, format="markdown"):
+        calls.append(html)
+        return convert(html, format)
+
+    monkeypatch.setattr(server, "convert_html", counting_convert)
+    return calls
+
+
+def test_markdown_conversion_drops_presentation_markup():
+    html = (
+        '<div style="color: red"><p>See <strong>the</strong> <a href="https://x.test">site</a>.</p>'
+        "<script>alert(1)</script><iframe src=\"https://video.test/1\"></iframe></div>"
+    )
+
+    [(title, text)] = server.convert_html(html)
+
+    assert title == "(untitled)"
+    assert text == "See **the** [site](https://x.test).\n\n[iframe: https://video.test/1]"
+
+
+def test_markdown_table_has_header_separator():
+    html = "<table><tr><th>Week</th><th>Topic</th></tr><tr><td>1</td><td>Intro</td></tr></table>"
+
+    [(_, text)] = server.convert_html(html)
+
+    assert text == "| Week | Topic |\n| --- | --- |\n| 1 | Intro |"
+
+
+def test_text_table_has_no_separator():
+    html = "<table><tr><th>Week</th></tr><tr><td>1</td></tr></table>"
+
+    assert server.convert_html(html, "text") == [("(untitled)", "| Week |\n| 1 |")]
+
+
+def test_sections_split_at_headings():
+    html = "<p>Intro</p><h2>Grading</h2><ul><li>Exams</li></ul><h2>Schedule</h2><p>Weekly</p>"
+
+    sections = server.convert_html(html)
+
+    assert [title for title, _ in sections] == ["(untitled)", "Grading", "Schedule"]
+    assert sections[1][1] == "## Grading\n\n- Exams"
+
+
+def test_paragraphs_inside_list_items_stay_in_the_item():
+    html = "<ul><li><p>One</p></li><li><p>Two</p><p>More</p></li></ul>"
+
+    assert server.convert_html(html) == [("(untitled)", "- One\n- Two\n  More")]
+
+
+def test_paragraphs_inside_table_cells_keep_the_row():
+    html = "<table><tr><th>Week</th></tr><tr><td><p>Intro</p><p>Setup</p></td></tr></table>"
+
+    [(_, text)] = server.convert_html(html)
+
+    assert text == "| Week |\n| --- |\n| Intro Setup |"
+
+
+def test_preformatted_whitespace_is_preserved():
+    html = "<p>Run:</p><pre>if x:  \n    go()\n\n\n\ndone</pre>"
+
+    [(_, text)] = server.convert_html(html)
+
+    assert text == "Run:\n\n```\nif x:  \n    go()\n\n\n\ndone\n```"
+
+
+def test_empty_heading_does_not_start_a_section():
+    html = "<p>Intro</p><h3> </h3><p>Body</p>"
+
+    assert server.convert_html(html) == [("(untitled)", "Intro\n\nBody")]
+
+
+def test_content_view_pages_and_truncates():
+    sections = [("(untitled)", "Intro"), ("Grading", "## Grading\n\nExams")]
+
+    text, view = server.content_view(sections, 1, 5)
+
+    assert text == "## Gr"
+    assert view == {"section": 1, "sections": ["(untitled)", "Grading"], "truncated": True, "total_chars": 17}
+
+
+@pytest.mark.parametrize("max_chars", [0, -5])
+def test_content_view_rejects_non_positive_max_chars(max_chars):
+    with pytest.raises(ValueError):
+        server.content_view([("(untitled)", "text")], None, max_chars)
+
+
+@pytest.mark.parametrize("max_chars", [0, -5])
+async def test_tools_reject_non_positive_max_chars(canvas, max_chars):
+    with pytest.raises(ValueError):
+        await server.get_conversation(1, max_chars=max_chars)
+    assert canvas.calls() == []
+
+
+async def test_repeat_page_reads_do_no_conversion_work(canvas, conversions):
+    page = {"page_id": 7, "updated_at": "2026-01-01T00:00:00Z", "body": "<h1>A</h1><p>x</p>"}
+    canvas.handler = lambda request: httpx.Response(200, json=page)
+
+    first = await server.get_page(1, "intro")
+    second = await server.get_page(1, "intro")
+
+    assert first["body"] == second["body"] == "# A\n\nx"
+    assert len(conversions) == 1
+
+
+async def test_small_messages_are_not_cached(canvas, content_cache, conversions):
+    conversation = {"id": 3, "messages": [{"id": i, "body": f"<p>{i}</p>", "created_at": "t"} for i in range(20)]}
+    canvas.handler = lambda request: httpx.Response(200, json=conversation)
+
+    result = await server.get_conversation(3)
+
+    assert [message["body"] for message in result["messages"]] == [str(i) for i in range(20)]
+    assert content_cache.total_chars == 0
+
+
+async def test_plain_text_messages_keep_their_line_breaks(canvas, conversions):
+    body = "Hi,\n\nThe lab moved to room 2 < 3.\n  - Bring a laptop"
+    conversation = {"id": 3, "messages": [{"id": 1, "body": body, "created_at": "t"}]}
+    canvas.handler = lambda request: httpx.Response(200, json=conversation)
+
+    result = await server.get_conversation(3)
+
+    assert result["messages"][0]["body"] == body
+    assert conversions == []
+
+
+async def test_large_messages_are_cached(canvas, content_cache, monkeypatch):
+    monkeypatch.setattr(server, "CONTENT_OFFLOAD_CHARS", 10)
+    view = {"view": [{"id": 1, "message": "<p>" + "long reply " * 5 + "</p>", "replies": []}]}
+    canvas.handler = lambda request: httpx.Response(200, json=view)
+
+    result = await server.get_discussion(1, 2, max_chars=10)
+
+    assert result["view"][0]["message"] == "long reply"
+    assert result["view"][0]["message_truncated"] is True
+    assert content_cache.total_chars > 0
+
+
+async def test_content_does_not_evict_cached_responses(canvas, monkeypatch):
+    monkeypatch.setattr(server, "_backend", server.MemoryBackend(max_entries=10))
+    canvas.handler = lambda request: httpx.Response(200, json=[{"name": "Week 1"}])
+    await server.make_cached_canvas_request("courses/1/modules", ttl=60, max_stale=600)
+
+    for i in range(20):
+        await server.render_html("page", i, "v1", f"<p>page {i}</p>", "markdown")
+
+    assert await server.cache_get(server.cache_key("courses/1/modules", None)) is not None
+
+
+def test_content_cache_is_bounded_by_total_chars():
+    cache = server.ContentCache(max_chars=100, ttl=60)
+    for i in range(5):
+        cache.set(f"doc{i}", [("(untitled)", "x" * 30)])
+
+    assert cache.total_chars <= 100
+    assert cache.get("doc0") is None
+    assert cache.get("doc4") is not None
+
+    cache.set("huge", [("(untitled)", "x" * 500)])
+    assert cache.get("huge") is None
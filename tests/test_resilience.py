@@ -0,0 +1,262 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_get_is_retried_after_503(canvas):
+    statuses = iter([503, 200])
+    canvas.handler = lambda request: httpx.Response(next(statuses), json={"ok": True})
+
+    assert await server.make_canvas_request("GET", "courses/1") == {"ok": True}
+    assert len(canvas.calls("GET")) == 2
+
+
+async def test_retry_after_header_is_honored(canvas, monkeypatch):
+    delays = []
+
+    async def sleep(seconds):
+        delays.append(seconds)
+
+    monkeypatch.setattr(server.asyncio, "sleep", sleep)
+    statuses = iter([429, 200])
+    canvas.handler = lambda request: httpx.Response(next(statuses), headers={"Retry-After": "2"}, json={})
+
+    await server.make_canvas_request("GET", "courses/1")
+    assert delays == [2.0]
+
+
+async def test_post_is_not_retried_after_502(canvas):
+    canvas.handler = lambda request: httpx.Response(502)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await server.make_canvas_request("POST", "conversations", data={"body": "hi"})
+    assert len(canvas.calls("POST")) == 1
+
+
+async def test_post_is_not_retried_after_read_timeout(canvas):
+    def handler(request):
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    canvas.handler = handler
+
+    with pytest.raises(httpx.ReadTimeout):
+        await server.make_canvas_request("POST", "conversations", data={"body": "hi"})
+    assert len(canvas.calls("POST")) == 1
+
+
+async def test_post_is_retried_after_429(canvas):
+    statuses = iter([429, 200])
+    canvas.handler = lambda request: httpx.Response(next(statuses), json={"id": 1})
+
+    assert await server.make_canvas_request("POST", "conversations", data={}) == {"id": 1}
+    assert len(canvas.calls("POST")) == 2
+
+
+async def test_post_is_retried_after_connect_error(canvas):
+    attempts = iter([True, False])
+
+    def handler(request):
+        if next(attempts):
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, json={"id": 1})
+
+    canvas.handler = handler
+
+    assert await server.make_canvas_request("POST", "conversations", data={}) == {"id": 1}
+    assert len(canvas.calls("POST")) == 2
+
+
+async def test_retries_count_as_one_breaker_failure(canvas, monkeypatch):
+    monkeypatch.setattr(server, "CANVAS_MAX_RETRIES", 3)
+    canvas.handler = lambda request: httpx.Response(503)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await server.make_canvas_request("GET", "courses/1")
+    assert len(canvas.calls()) == 4
+    assert server.get_breaker("courses/*").failures == 1
+
+
+async def test_breaker_opens_fails_fast_and_closes_after_probe(canvas, monkeypatch):
+    monkeypatch.setattr(server, "CANVAS_MAX_RETRIES", 0)
+    monkeypatch.setattr(server, "CANVAS_BREAKER_THRESHOLD", 2)
+    monkeypatch.setattr(server, "CANVAS_BREAKER_COOLDOWN", 0.05)
+    canvas.handler = lambda request: httpx.Response(500)
+
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError):
+            await server.make_canvas_request("GET", "courses/1/pages/intro")
+    assert server.get_breaker("courses/*/pages/*").state == "open"
+
+    with pytest.raises(server.CircuitOpenError):
+        await server.make_canvas_request("GET", "courses/2/pages/other")
+    assert len(canvas.calls()) == 2
+
+    await asyncio.sleep(0.06)
+    assert server.get_breaker("courses/*/pages/*").state == "half_open"
+    canvas.handler = lambda request: httpx.Response(200, json={"title": "Intro"})
+
+    assert await server.make_canvas_request("GET", "courses/1/pages/intro") == {"title": "Intro"}
+    assert server.get_breaker("courses/*/pages/*").state == "closed"
+
+
+async def test_failed_probe_reopens_breaker(canvas, monkeypatch):
+    monkeypatch.setattr(server, "CANVAS_MAX_RETRIES", 0)
+    monkeypatch.setattr(server, "CANVAS_BREAKER_THRESHOLD", 1)
+    monkeypatch.setattr(server, "CANVAS_BREAKER_COOLDOWN", 0.05)
+    canvas.handler = lambda request: httpx.Response(500)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await server.make_canvas_request("GET", "courses/1")
+    await asyncio.sleep(0.06)
+    with pytest.raises(httpx.HTTPStatusError):
+        await server.make_canvas_request("GET", "courses/1")
+
+    assert server.get_breaker("courses/*").state == "open"
+
+
+async def test_client_errors_do_not_trip_breaker(canvas, monkeypatch):
+    monkeypatch.setattr(server, "CANVAS_BREAKER_THRESHOLD", 1)
+    canvas.handler = lambda request: httpx.Response(404)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await server.make_canvas_request("GET", "courses/1")
+    assert server.get_breaker("courses/*").state == "closed"
+
+
+async def test_hedged_get_wins_over_slow_primary(canvas, monkeypatch):
+    monkeypatch.setattr(server, "CANVAS_HEDGE_PERCENTILE", 50)
+    for _ in range(server.HEDGE_MIN_SAMPLES):
+        server.record_latency("courses/*", 0.01)
+
+    async def handler(request):
+        if len(canvas.requests) == 1:
+            await asyncio.sleep(5)
+            return httpx.Response(200, json={"from": "primary"})
+        return httpx.Response(200, json={"from": "hedge"})
+
+    canvas.handler = handler
+
+    started = time.monotonic()
+    assert await server.make_canvas_request("GET", "courses/1") == {"from": "hedge"}
+    assert time.monotonic() - started < 1
+    assert len(canvas.calls("GET")) == 2
+
+
+async def test_hedging_needs_enough_samples(canvas, monkeypatch):
+    monkeypatch.setattr(server, "CANVAS_HEDGE_PERCENTILE", 50)
+    server.record_latency("courses/*", 0.01)
+
+    assert server.hedge_delay("courses/*") is None
+
+
+def test_endpoint_class_collapses_ids():
+    assert server.endpoint_class("courses/1/pages/intro") == "courses/*/pages/*"
+    assert server.endpoint_class("users/self/profile") == "users/*/profile"
+
+
+async def test_hedged_get_ignores_fast_server_error(canvas, monkeypatch):
+    monkeypatch.setattr(server, "CANVAS_MAX_RETRIES", 0)
+    monkeypatch.setattr(server, "CANVAS_HEDGE_PERCENTILE", 50)
+    for _ in range(server.HEDGE_MIN_SAMPLES):
+        server.record_latency("courses/*", 0.01)
+
+    async def handler(request):
+        if len(canvas.requests) == 1:
+            await asyncio.sleep(0.1)
+            return httpx.Response(200, json={"from": "primary"})
+        return httpx.Response(503)
+
+    canvas.handler = handler
+
+    assert await server.make_canvas_request("GET", "courses/1") == {"from": "primary"}
+
+
+async def test_cancelled_caller_cancels_hedged_requests(canvas, monkeypatch):
+    monkeypatch.setattr(server, "CANVAS_HEDGE_PERCENTILE", 50)
+    for _ in range(server.HEDGE_MIN_SAMPLES):
+        server.record_latency("courses/*", 1)
+    finished = []
+
+    async def handler(request):
+        await asyncio.sleep(0.2)
+        finished.append(request)
+        return httpx.Response(200, json={})
+
+    canvas.handler = handler
+
+    call = asyncio.ensure_future(server.make_canvas_request("GET", "courses/1"))
+    await asyncio.sleep(0.05)
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+    await asyncio.sleep(0.3)
+
+    assert len(canvas.requests) == 1
+    assert finished == []
+
+
+async def test_retries_stop_at_call_deadline(canvas, monkeypatch):
+    monkeypatch.setattr(server, "CANVAS_MAX_RETRIES", 10)
+    monkeypatch.setattr(server, "CANVAS_DEADLINE", 0.3)
+    monkeypatch.setattr(server, "MIN_ATTEMPT_SECONDS", 0.1)
+
+    async def handler(request):
+        await asyncio.sleep(0.1)
+        return httpx.Response(503)
+
+    canvas.handler = handler
+
+    started = time.monotonic()
+    with pytest.raises(httpx.HTTPStatusError):
+        await server.make_canvas_request("GET", "courses/1")
+
+    assert len(canvas.calls("GET")) == 2
+    assert time.monotonic() - started < 0.5
+
+
+async def test_attempt_timeout_is_capped_by_call_deadline(canvas, monkeypatch):
+    monkeypatch.setattr(server, "CANVAS_TIMEOUT", 10)
+    monkeypatch.setattr(server, "CANVAS_DEADLINE", 2)
+    canvas.handler = lambda request: httpx.Response(200, json={})
+
+    await server.make_canvas_request("GET", "courses/1")
+
+    assert canvas.calls("GET")[0].extensions["timeout"]["read"] <= 2
+
+
+@pytest.mark.parametrize("method", ["GET", "POST"])
+async def test_canvas_rate_limit_403_is_retried(canvas, method):
+    responses = iter([
+        httpx.Response(403, text="403 Forbidden (Rate Limit Exceeded)"),
+        httpx.Response(403, headers={"X-Rate-Limit-Remaining": "0"}, text="Forbidden"),
+        httpx.Response(200, json={"ok": True}),
+    ])
+    canvas.handler = lambda request: next(responses)
+
+    assert await server.make_canvas_request(method, "courses/1/discussion_topics") == {"ok": True}
+    assert len(canvas.calls(method)) == 3
+
+
+async def test_plain_403_is_not_retried(canvas):
+    canvas.handler = lambda request: httpx.Response(403, json={"errors": "unauthorized"})
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await server.make_canvas_request("GET", "courses/1")
+    assert len(canvas.calls("GET")) == 1
+
+
+async def test_throttling_does_not_reset_breaker(canvas, monkeypatch):
+    monkeypatch.setattr(server, "CANVAS_MAX_RETRIES", 0)
+    breaker = server.get_breaker("courses/*")
+    breaker.failures = 2
+    canvas.handler = lambda request: httpx.Response(403, text="403 Forbidden (Rate Limit Exceeded)")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await server.make_canvas_request("GET", "courses/1")
+    assert breaker.failures == 2
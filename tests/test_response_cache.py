@@ -0,0 +1,113 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+async def seed(endpoint, data, age, params=None, expires_in=3600):
+    """Put a response in the cache as if it was fetched `age` seconds ago."""
+    entry = json.dumps({"fetched_at": time.time() - age, "data": data})
+    await server.get_backend().set(server.cache_key(endpoint, params), entry, ttl=expires_in)
+
+
+async def test_fresh_entry_is_served_without_calling_canvas(canvas):
+    await seed("courses/1/modules", [{"name": "cached"}], age=5)
+
+    data, stale_age = await server.make_cached_canvas_request("courses/1/modules", ttl=60, max_stale=600)
+
+    assert data == [{"name": "cached"}]
+    assert stale_age is None
+    assert canvas.calls() == []
+
+
+async def test_stale_entry_is_served_and_refreshed_in_background(canvas):
+    await seed("courses/1/modules", [{"name": "old"}], age=120)
+    canvas.handler = lambda request: httpx.Response(200, json=[{"name": "new"}])
+
+    data, stale_age = await server.make_cached_canvas_request("courses/1/modules", ttl=60, max_stale=600)
+    assert data == [{"name": "old"}]
+    assert stale_age >= 120
+
+    await asyncio.gather(*server._refreshing.values())
+    data, stale_age = await server.make_cached_canvas_request("courses/1/modules", ttl=60, max_stale=600)
+    assert data == [{"name": "new"}]
+    assert stale_age is None
+    assert len(canvas.calls()) == 1
+
+
+async def test_stale_entry_survives_failed_refresh(canvas, monkeypatch):
+    monkeypatch.setattr(server, "CANVAS_MAX_RETRIES", 0)
+    await seed("courses/1/modules", [{"name": "old"}], age=120)
+    canvas.handler = lambda request: httpx.Response(503)
+
+    await server.make_cached_canvas_request("courses/1/modules", ttl=60, max_stale=600)
+    await asyncio.gather(*server._refreshing.values())
+    data, stale_age = await server.make_cached_canvas_request("courses/1/modules", ttl=60, max_stale=600)
+
+    assert data == [{"name": "old"}]
+    assert stale_age is not None
+
+
+async def test_expired_entry_is_refetched_before_returning(canvas):
+    await seed("courses/1/modules", [{"name": "ancient"}], age=1000)
+    canvas.handler = lambda request: httpx.Response(200, json=[{"name": "new"}])
+
+    data, stale_age = await server.make_cached_canvas_request("courses/1/modules", ttl=60, max_stale=600)
+
+    assert data == [{"name": "new"}]
+    assert stale_age is None
+    assert server._refreshing == {}
+
+
+async def test_concurrent_stale_reads_share_one_refresh(canvas):
+    await seed("courses/1/modules", [{"name": "old"}], age=120)
+
+    async def handler(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=[{"name": "new"}])
+
+    canvas.handler = handler
+
+    for _ in range(5):
+        await server.make_cached_canvas_request("courses/1/modules", ttl=60, max_stale=600)
+    await asyncio.gather(*server._refreshing.values())
+
+    assert len(canvas.calls()) == 1
+
+
+async def test_mark_module_item_done_invalidates_cached_modules(canvas):
+    await seed("courses/1/modules", [{"state": "unlocked"}], age=5)
+    await seed("courses/1/modules", [{"state": "unlocked"}], age=5, params={"include[]": ["items"]})
+    await seed("courses/2/modules", [{"state": "other"}], age=5)
+    canvas.handler = lambda request: httpx.Response(204)
+
+    await server.mark_module_item_done(1, 10, 100)
+
+    assert await server.cache_get(server.cache_key("courses/1/modules", None)) is None
+    assert await server.cache_get(server.cache_key("courses/1/modules", {"include[]": ["items"]})) is None
+    assert await server.cache_get(server.cache_key("courses/2/modules", None)) is not None
+
+
+@pytest.mark.parametrize("submit", [
+    lambda: server.submit_assignment(1, 10, "online_text_entry", body="done"),
+    lambda: server.complete_quiz_submission(1, 20, 30),
+    lambda: server.create_discussion_entry(1, 40, "reply"),
+])
+async def test_submissions_invalidate_cached_modules(canvas, submit):
+    await seed("courses/1/modules", [{"state": "unlocked"}], age=5)
+    canvas.handler = lambda request: httpx.Response(200, json={"id": 1})
+
+    await submit()
+
+    assert await server.cache_get(server.cache_key("courses/1/modules", None)) is None
+
+
+async def test_stale_list_results_are_flagged():
+    assert server.mark_stale([1], 30.0) == {"items": [1], "stale": True, "stale_age_seconds": 30.0}
+    assert server.mark_stale({"a": 1}, None) == {"a": 1}
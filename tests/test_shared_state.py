@@ -0,0 +1,149 @@
+import asyncio
+import contextvars
+import time
+
+import httpx
+import pytest
+
+import server
+from fakes import FakeRedis
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return server.MemoryBackend(max_entries=100)
+    return server.RedisBackend(client=FakeRedis())
+
+
+async def test_backend_set_get_and_expiry(backend):
+    await backend.set("a", "1", ttl=0.05)
+    await backend.set("b", "2")
+    assert await backend.get("a") == "1"
+
+    await asyncio.sleep(0.06)
+    assert await backend.get("a") is None
+    assert await backend.get("b") == "2"
+
+
+async def test_backend_add_only_sets_missing_keys(backend):
+    assert await backend.add("lock", "one", ttl=0.05)
+    assert not await backend.add("lock", "two")
+    assert await backend.get("lock") == "one"
+
+    await asyncio.sleep(0.06)
+    assert await backend.add("lock", "three")
+
+
+async def test_backend_incr_keeps_expiry_from_creation(backend):
+    assert await backend.incr("n", ttl=0.05) == 1
+    assert await backend.incr("n", ttl=0.05) == 2
+
+    await asyncio.sleep(0.06)
+    assert await backend.incr("n", ttl=0.05) == 1
+
+
+async def test_backend_delete_prefix(backend):
+    await backend.set("cache:t:courses/1/modules?{}", "x")
+    await backend.set("cache:t:courses/1/modules?{\"a\": 1}", "x")
+    await backend.set("cache:t:courses/1/modules/2/items?{}", "x")
+
+    await backend.delete_prefix("cache:t:courses/1/modules?")
+
+    assert await backend.get("cache:t:courses/1/modules?{}") is None
+    assert await backend.get("cache:t:courses/1/modules?{\"a\": 1}") is None
+    assert await backend.get("cache:t:courses/1/modules/2/items?{}") == "x"
+
+
+async def test_memory_backend_evicts_least_recently_used():
+    backend = server.MemoryBackend(max_entries=2)
+    await backend.set("a", "1")
+    await backend.set("b", "2")
+    await backend.get("a")
+    await backend.set("c", "3")
+
+    assert await backend.get("a") == "1"
+    assert await backend.get("b") is None
+    assert await backend.get("c") == "3"
+
+
+async def test_memory_backend_evicts_expired_keys_before_live_ones():
+    backend = server.MemoryBackend(max_entries=3)
+    await backend.set("cache", "1")
+    await backend.incr("ratelimit:t:1", ttl=0.05)
+    await backend.add("lock:cache", "owner", ttl=0.05)
+
+    await asyncio.sleep(0.06)
+    await backend.set("other", "2")
+
+    assert await backend.get("cache") == "1"
+    assert await backend.get("other") == "2"
+
+
+_worker_backend = contextvars.ContextVar("worker_backend")
+
+
+async def test_rate_limit_holds_across_workers_sharing_redis(canvas, monkeypatch):
+    shared = FakeRedis()
+    workers = [server.RedisBackend(client=shared), server.RedisBackend(client=shared)]
+    monkeypatch.setattr(server, "get_backend", lambda: _worker_backend.get())
+    monkeypatch.setattr(server, "CANVAS_RATE_LIMIT", 3)
+    acquired = []
+
+    async def worker(backend, requests):
+        _worker_backend.set(backend)
+        for _ in range(requests):
+            await server.acquire_rate_limit()
+            acquired.append(int(time.time()))
+
+    await asyncio.gather(worker(workers[0], 4), worker(workers[1], 4))
+
+    per_window = {window: acquired.count(window) for window in acquired}
+    assert len(acquired) == 8
+    assert max(per_window.values()) <= 3
+
+
+async def test_low_remaining_quota_is_shared_between_workers(canvas, monkeypatch):
+    shared = FakeRedis()
+    monkeypatch.setattr(server, "_backend", server.RedisBackend(client=shared))
+    monkeypatch.setattr(server, "CANVAS_RATE_LIMIT", 100)
+    canvas.handler = lambda request: httpx.Response(200, headers={"X-Rate-Limit-Remaining": "5"}, json={})
+
+    await server.make_canvas_request("GET", "courses/1")
+
+    # A second worker on the same store sees the low quota and waits for the next window
+    monkeypatch.setattr(server, "_backend", server.RedisBackend(client=shared))
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(server.acquire_rate_limit(), timeout=0.1)
+
+
+async def test_refresh_skipped_while_another_worker_holds_the_lock(canvas):
+    key = server.cache_key("courses/1/modules", None)
+    await server.get_backend().add(f"lock:{key}", "other-worker", ttl=60)
+
+    server.schedule_refresh(key, "courses/1/modules", None, 600)
+    await asyncio.gather(*server._refreshing.values())
+
+    assert canvas.calls() == []
+    assert await server.get_backend().get(f"lock:{key}") == "other-worker"
+
+
+async def test_refresh_lock_released_after_failed_refresh(canvas, monkeypatch):
+    monkeypatch.setattr(server, "CANVAS_MAX_RETRIES", 0)
+    canvas.handler = lambda request: httpx.Response(503)
+    key = server.cache_key("courses/1/modules", None)
+
+    server.schedule_refresh(key, "courses/1/modules", None, 600)
+    await asyncio.gather(*server._refreshing.values())
+
+    assert len(canvas.calls()) == 1
+    assert await server.get_backend().get(f"lock:{key}") is None
+
+
+def test_refresh_lock_outlives_worst_case_call(monkeypatch):
+    monkeypatch.setattr(server, "CANVAS_TIMEOUT", 10)
+    monkeypatch.setattr(server, "CANVAS_DEADLINE", 30)
+
+    assert server.max_call_duration() >= 30 + 10
@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def fast_startup(monkeypatch):
+    monkeypatch.setenv("MCP_FAST_STARTUP", "1")
+    monkeypatch.setattr(server, "MCP_FAST_STARTUP", True)
+
+
+def test_fast_startup_phases_stay_within_budget(fast_startup, capsys):
+    # Total import time depends on the machine, so only the relative gates run by default
+    assert server.benchmark_startup(runs=3, budget_ms=float("inf")) == 0, capsys.readouterr().out
+
+
+@pytest.mark.skipif(
+    not os.environ.get("MCP_STARTUP_BENCHMARK"),
+    reason="wall-clock gate; set MCP_STARTUP_BENCHMARK=1 on a quiet machine"
+)
+def test_fast_startup_stays_within_budget(fast_startup, capsys):
+    assert server.benchmark_startup(runs=5) == 0, capsys.readouterr().out
+
+
+def test_benchmark_fails_when_startup_phases_exceed_budget(fast_startup, capsys):
+    assert server.benchmark_startup(runs=1, phase_budget_ms=0) == 1
+    assert "tool_definitions" in capsys.readouterr().out
+
+
+def test_deferred_tools_are_registered_on_demand(monkeypatch):
+    monkeypatch.setattr(server, "MCP_FAST_STARTUP", True)
+    monkeypatch.setattr(server, "_tools_registered", False)
+    registered = []
+    monkeypatch.setattr(server, "_tool_specs", [])
+    monkeypatch.setattr(server.mcp, "tool", lambda **kwargs: registered.append)
+
+    @server.canvas_tool(description="Deferred tool")
+    async def deferred_tool() -> dict:
+        return {}
+
+    assert registered == []
+    server.register_tools()
+    assert registered == [deferred_tool]
+
+
+def test_worker_processes_import_server_once():
+    # Load the launched script the way a spawned uvicorn worker does, then the factory
+    probe = (
+        "import sys, multiprocessing.spawn; "
+        "multiprocessing.spawn._fixup_main_from_path('server.py'); "
+        "import server; "
+        "print(server.mcp is sys.modules['__mp_main__'].mcp)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=os.path.dirname(server.__file__),
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+
+    assert output.splitlines()[-1] == "True"